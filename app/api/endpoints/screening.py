@@ -1,17 +1,37 @@
 import logging
+import time
 
-from fastapi import APIRouter, HTTPException, Request
-from app.models.schemas import ScreeningRequest, ScreeningResponse
-from app.services.screening_service import ScreeningService
-from app.repositories.storage import FileStorageRepository
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.models.schemas import DiseaseResult, ScreeningRequest, ScreeningResponse
+from app.services.screening_service import ScreeningService, get_screening_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Dioverride dari main.py via module assignment
-screening_service: ScreeningService | None = None
-storage_repo: FileStorageRepository | None = None
-knowledge_provider = None
+# Cache timestamp ISO8601 per detik: strftime cukup dijalankan sekali per detik
+_ts_cache = (0, "")
+
+
+def _utc_timestamp() -> str:
+    global _ts_cache
+    sec = int(time.time())
+    if _ts_cache[0] != sec:
+        _ts_cache = (sec, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sec)))
+    return _ts_cache[1]
+
+
+async def screening_service_dependency() -> ScreeningService:
+    # Dependency async agar FastAPI tidak memindahkannya ke threadpool tiap request;
+    # override di test via app.dependency_overrides[screening_service_dependency]
+    return get_screening_service()
+
+
+def _to_disease_result(d) -> DiseaseResult:
+    # Data berasal dari ScreeningService (terpercaya): model_construct melewati validasi ulang
+    return DiseaseResult.model_construct(
+        kategori=d["Kategori"], gejala=d["Gejala"], rekomendasi=d["Rekomendasi"]
+    )
+
 
 @router.post(
     "/screening",
@@ -27,39 +47,39 @@ knowledge_provider = None
       - SS: Sangat Setuju (Strongly Agree)
 
     Semua 21 gejala (G01-G21) wajib diisi.
-    """,
-    responses={
- 
-    }
+    """
 )
 async def screening_endpoint(
     request: Request,
-    screening_data: ScreeningRequest
+    screening_data: ScreeningRequest,
+    screening_service: ScreeningService = Depends(screening_service_dependency)
 ):
-    global screening_service, storage_repo
-
     try:
         # Jalankan proses screening
         results, hasil_cf = screening_service.process_screening(screening_data.jawaban)
 
-        if storage_repo: storage_repo.save_percentages({
-        "timestamp": __import__('datetime').datetime.utcnow().isoformat(),
-        "percentages": hasil_cf
-    })
+        # Non-blocking: record masuk antrean (storage dibuat di lifespan), ditulis per batch.
+        # Storage opsional; kegagalan menyimpan tidak boleh menggagalkan hasil screening.
+        storage_repo = getattr(request.app.state, "storage_repo", None)
+        if storage_repo:
+            try:
+                storage_repo.save_percentages({
+                    "timestamp": _utc_timestamp(),
+                    "percentages": hasil_cf
+                })
+            except Exception as e:
+                logger.error("Failed to store screening result: %s", e, exc_info=True)
 
-        def to_disease_result(d):
-            return {"kategori": d["Kategori"], "gejala": d["Gejala"], "rekomendasi": d["Rekomendasi"]}
-
-        return ScreeningResponse(
-        Depresi=to_disease_result(results["Depresi"]),
-        Kecemasan=to_disease_result(results["Kecemasan"]),
-        Stres=to_disease_result(results["Stres"])
-)
+        return ScreeningResponse.model_construct(
+            Depresi=_to_disease_result(results["Depresi"]),
+            Kecemasan=_to_disease_result(results["Kecemasan"]),
+            Stres=_to_disease_result(results["Stres"])
+        )
 
     except ValueError as e:
-        logger.warning(f"Validation error: {str(e)}")
+        logger.warning("Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
     except Exception as e:
-        logger.error(f"Screening error: {str(e)}", exc_info=True)
+        logger.error("Screening error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error occurred")
\ No newline at end of file
@@ -1,14 +1,14 @@
 import os
-import uvicorn
+import time
 import logging
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 
 from app.api.endpoints import screening as screening_module
-from app.models.schemas import InMemoryKnowledgeProvider
-from app.services.screening_service import ScreeningService
 from app.repositories.storage import FileStorageRepository
 
 
@@ -23,6 +23,7 @@ class Settings:
         self.host = os.getenv("HOST", "0.0.0.0")
         self.port = int(os.getenv("PORT", "8000"))
         self.debug = os.getenv("DEBUG", "True").lower() == "true"
+        self.workers = int(os.getenv("WEB_CONCURRENCY", "1"))
 
 
 settings = Settings()
@@ -40,10 +41,16 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Mental Health Screening API")
-    logger.info(f"App: {settings.app_name} v{settings.app_version}")
-    logger.info(f"Environment: {'Development' if settings.debug else 'Production'}")
+    logger.info("App: %s v%s", settings.app_name, settings.app_version)
+    logger.info("Environment: %s", "Development" if settings.debug else "Production")
+
+    # Storage punya siklus hidup (background writer), jadi dibuat di sini dan dibaca via app.state.
+    # ScreeningService di-inject lazy lewat Depends (lihat app/services/screening_service.py).
+    app.state.storage_repo = FileStorageRepository(path="data/screening_results.jsonl")
+    await app.state.storage_repo.start()
     yield
     logger.info("Shutting down API")
+    await app.state.storage_repo.stop()  # flush record yang masih di antrean
 
 
 # ==============================
@@ -60,47 +67,49 @@ app = FastAPI(
     """,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 
 # ==============================
-# DEPENDENCY INJECTION
+# ROUTES DASAR
 # ==============================
-knowledge_provider = InMemoryKnowledgeProvider()
-screening_service = ScreeningService(knowledge_provider)
-storage_repo = FileStorageRepository(path="data/screening_results.jsonl")
-
-screening_module.knowledge_provider = knowledge_provider
-screening_module.screening_service = screening_service
-screening_module.storage_repo = storage_repo
+# Payload "/" statis: di-encode sekali saat import
+_ROOT_BODY = orjson.dumps({
+    "message": "Mental Health Screening API",
+    "version": settings.app_version,
+    "status": "operational",
+    "endpoints": {
+        "docs": "/docs",
+        "health": "/health",
+        "screening": f"{settings.api_prefix}/screening",
+    },
+})
 
 
-# ==============================
-# ROUTES DASAR
-# ==============================
 @app.get("/")
 async def root():
-    return {
-        "message": "Mental Health Screening API",
-        "version": settings.app_version,
-        "status": "operational",
-        "endpoints": {
-            "docs": "/docs",
-            "health": "/health",
-            "screening": f"{settings.api_prefix}/screening",
-        },
-    }
+    return Response(_ROOT_BODY, media_type="application/json")
+
+
+# Body "/health" di-cache maks 0.5 detik: probe liveness beruntun memakai timestamp yang sama
+HEALTH_CACHE_TTL = 0.5
+_health_cache = [float("-inf"), b""]
 
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "version": settings.app_version,
-        "service": settings.app_name,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    now = time.monotonic()
+    if now - _health_cache[0] > HEALTH_CACHE_TTL:
+        _health_cache[0] = now
+        _health_cache[1] = orjson.dumps({
+            "status": "healthy",
+            "version": settings.app_version,
+            "service": settings.app_name,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
+    return Response(_health_cache[1], media_type="application/json")
 
 
 # ==============================
@@ -110,14 +119,22 @@ app.include_router(screening_module.router, prefix=settings.api_prefix, tags=["s
 
 
 # ==============================
-# RUN SERVER (DEV)
+# RUN SERVER
 # ==============================
+# Produksi: gunicorn -k uvicorn.workers.UvicornWorker -w <2*CPU+1> app.main:app
 if __name__ == "__main__":
-    logger.info("Running in DEVELOPMENT mode")
+    import uvicorn  # hanya dibutuhkan saat dijalankan langsung; worker ASGI sudah punya server sendiri
+
+    # --reload tidak bisa digabung dengan multi-worker; reload hanya aktif saat DEBUG
+    reload = settings.debug
+    if reload and settings.workers > 1:
+        logger.warning("WEB_CONCURRENCY=%d diabaikan: mode reload (DEBUG) hanya 1 worker", settings.workers)
+    logger.info("Running in %s mode", "DEVELOPMENT" if reload else "PRODUCTION")
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=True,
+        reload=reload,
+        workers=None if reload else settings.workers,
         log_level="info",
     )
\ No newline at end of file
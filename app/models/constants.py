@@ -0,0 +1,8 @@
+import sys
+from typing import FrozenSet, Tuple
+
+# ===== VALIDATION CONSTANTS =====
+# String di-intern agar pengecekan keanggotaan bisa memakai fast path perbandingan pointer.
+SYMPTOM_CODES: Tuple[str, ...] = tuple(sys.intern(f"G{i:02}") for i in range(1, 22))
+VALID_SYMPTOM_CODES: FrozenSet[str] = frozenset(SYMPTOM_CODES)
+VALID_SEVERITY_VALUES: FrozenSet[str] = frozenset(sys.intern(s) for s in ("TS", "AS", "S", "SS"))
@@ -1,13 +1,12 @@
 from __future__ import annotations
-from pydantic import BaseModel, Field, validator
-from typing import Dict, List
-from decimal import Decimal
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, Mapping, Tuple
+from functools import lru_cache
+from types import MappingProxyType
 import os
 
+from app.models.constants import SYMPTOM_CODES, VALID_SYMPTOM_CODES, VALID_SEVERITY_VALUES
 
-# ===== VALIDATION CONSTANTS =====
-VALID_SYMPTOM_CODES = {f"G{i:02}" for i in range(1, 22)}
-VALID_SEVERITY_VALUES = {"TS", "AS", "S", "SS"}
 
 # ===== REQUEST SCHEMAS =====
 class ScreeningRequest(BaseModel):
@@ -41,38 +40,46 @@ class ScreeningRequest(BaseModel):
             "}\n"
             "```"
         ),
-        example={f"G{i:02}": "TS" for i in range(1, 22)}
+        json_schema_extra={"example": {f"G{i:02}": "TS" for i in range(1, 22)}}
     )
     
-    @validator('jawaban')
-    def validate_symptom_codes(cls, v):
+    @field_validator('jawaban', mode='after')
+    @classmethod
+    def validate_symptom_codes(cls, v: Dict[str, str]) -> Dict[str, str]:
         """Validate input: kosong, kode gejala, nilai severity, dan kelengkapan 21 gejala"""
 
         # 1. Cek input kosong
         if not v:
             raise ValueError("Data kosong. Semua 21 gejala (G01-G21) wajib diisi")
 
-        # 2. Cek kode gejala tidak valid (di luar G01-G21)
-        invalid_codes = [c for c in v.keys() if c not in VALID_SYMPTOM_CODES]
+        # Fast path (kasus umum, payload valid): cek berbasis set di C tanpa alokasi list.
+        # Semua key valid + jumlah 21 berarti lengkap; list error hanya dibangun di jalur gagal.
+        if v.keys() == VALID_SYMPTOM_CODES and VALID_SEVERITY_VALUES.issuperset(v.values()):
+            return v
+
+        # 2 & 3. Satu kali iterasi: kumpulkan kode gejala (G01-G21) dan nilai severity (TS/AS/S/SS) tidak valid
+        invalid_codes = []
+        invalid_severity = []
+        for code, val in v.items():
+            if code not in VALID_SYMPTOM_CODES:
+                invalid_codes.append(code)
+            if val not in VALID_SEVERITY_VALUES:
+                invalid_severity.append((code, val))
+
         if invalid_codes:
             raise ValueError(
                 f"Kode gejala tidak valid: {', '.join(sorted(invalid_codes))}. Harus G01-G21"
             )
 
-        # 3. Cek nilai severity tidak valid (bukan TS/AS/S/SS)
-        invalid_severity = {
-            code: val for code, val in v.items()
-            if val not in VALID_SEVERITY_VALUES
-        }
         if invalid_severity:
-            detail = ", ".join(f"{k}='{val}'" for k, val in sorted(invalid_severity.items()))
+            detail = ", ".join(f"{k}='{val}'" for k, val in sorted(invalid_severity))
             raise ValueError(
                 f"Nilai severity tidak valid: {detail}. Harus salah satu dari: TS, AS, S, SS"
             )
 
-        # 4. Cek kelengkapan — semua 21 gejala wajib diisi
-        missing_codes = VALID_SYMPTOM_CODES - v.keys()
-        if missing_codes:
+        # 4. Cek kelengkapan — semua kode sudah valid, jadi cukup bandingkan jumlahnya
+        if len(v) < len(VALID_SYMPTOM_CODES):
+            missing_codes = VALID_SYMPTOM_CODES - v.keys()
             raise ValueError(
                 f"Gejala belum diisi: {', '.join(sorted(missing_codes))}. Semua 21 gejala wajib diisi"
             )
@@ -100,30 +107,43 @@ class ScreeningResponse(BaseModel):
     )
 
 # ===== Knowledge Provider (Data Layer) =====
+# Basis pengetahuan statis: dibangun sekali saat import dan dibagi semua instance provider.
+# Dibungkus MappingProxyType (read-only) agar tidak bisa diubah lewat salah satu instance.
+# Kode gejala (ter-intern) dari app.models.constants.
+_CF_PAKAR_DEFAULT = 0.9
+_CF_PAKAR: Mapping[str, float] = MappingProxyType({code: _CF_PAKAR_DEFAULT for code in SYMPTOM_CODES})
+_DISEASE_SYMPTOMS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Depresi":   ("G04", "G05", "G10", "G13", "G16", "G17", "G21"),
+    "Kecemasan": ("G02", "G03", "G07", "G09", "G15", "G19", "G20"),
+    "Stres":     ("G01", "G06", "G08", "G11", "G12", "G14", "G18"),
+})
+
 class KnowledgeProvider:
     """Interface for knowledge access (can be replaced by DB-backed impl)"""
-    def get_cf_pakar(self, symptom_code: str) -> Decimal:
+    def get_cf_pakar(self, symptom_code: str) -> float:
         raise NotImplementedError
-    def get_symptoms_for_disease(self, disease_name: str) -> List[str]:
+    def get_symptoms_for_disease(self, disease_name: str) -> Tuple[str, ...]:
         raise NotImplementedError
-    def list_all_symptoms(self) -> List[str]:
+    def list_all_symptoms(self) -> Tuple[str, ...]:
         raise NotImplementedError
 
 class InMemoryKnowledgeProvider(KnowledgeProvider):
     def __init__(self):
-        self.cf_pakar = {f"G{i:02}": Decimal('0.9') for i in range(1, 22)}
-        self.disease_symptoms = {
-            "Depresi":   ["G04", "G05", "G10", "G13", "G16", "G17", "G21"],
-            "Kecemasan": ["G02", "G03", "G07", "G09", "G15", "G19", "G20"],
-            "Stres":     ["G01", "G06", "G08", "G11", "G12", "G14", "G18"]
-        }
-
-    def get_cf_pakar(self, symptom_code: str) -> Decimal:
-        return self.cf_pakar.get(symptom_code, Decimal('0.0'))
-    def get_symptoms_for_disease(self, disease_name: str) -> List[str]:
-        return self.disease_symptoms.get(disease_name, [])
-    def list_all_symptoms(self) -> List[str]:
-        return list(self.cf_pakar.keys())
-
-# Default provider instance (used by endpoints/service unless swapped)
-knowledge_provider = InMemoryKnowledgeProvider()
\ No newline at end of file
+        self.cf_pakar = _CF_PAKAR
+        self.disease_symptoms = _DISEASE_SYMPTOMS
+
+    def get_cf_pakar(self, symptom_code: str) -> float:
+        return self.cf_pakar.get(symptom_code, 0.0)
+    def get_symptoms_for_disease(self, disease_name: str) -> Tuple[str, ...]:
+        return self.disease_symptoms.get(disease_name, ())
+    def list_all_symptoms(self) -> Tuple[str, ...]:
+        return tuple(self.cf_pakar)
+
+@lru_cache(maxsize=1)
+def get_knowledge_provider() -> KnowledgeProvider:
+    """Default provider, dibuat lazy sekali per proses/worker.
+
+    Bukan dependency route: untuk mengganti service di test, override
+    screening_service_dependency lewat app.dependency_overrides.
+    """
+    return InMemoryKnowledgeProvider()
\ No newline at end of file
@@ -1,5 +1,6 @@
-from typing import Dict, Any
-import json
+from typing import Dict, Any, List, Optional
+import asyncio
+import orjson
 from datetime import datetime
 import os
 import logging
@@ -13,6 +14,13 @@ class StorageRepository:
     """Interface for storing screening results (percentages + metadata)."""
     def save_percentages(self, record: Dict[str, Any]) -> None:
         raise NotImplementedError
+    def save_batch(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            self.save_percentages(record)
+    async def start(self) -> None:
+        """Dipanggil di lifespan startup (mis. menyalakan background writer)."""
+    async def stop(self) -> None:
+        """Dipanggil di lifespan shutdown; harus mem-flush data yang tertunda."""
 
 class FileStorageRepository(StorageRepository):
     """
@@ -24,19 +32,106 @@ class FileStorageRepository(StorageRepository):
       "percentages": { "Depresi": 12.34, ... },
       "meta": {...}
     }
+
+    Setelah start(), save_percentages hanya memasukkan record ke antrean; background writer
+    menulisnya per batch (maks `batch_size` record atau `flush_interval` detik) lewat satu
+    file handle yang dibuka sekali.
     """
-    def __init__(self, path: str = "data/screening_results.jsonl"):
+    def __init__(
+        self,
+        path: str = "data/screening_results.jsonl",
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        queue_maxsize: int = 10000,
+    ):
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_maxsize = queue_maxsize
+        self._fh = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._fh = open(self.path, "ab")
+        self._queue = asyncio.Queue(maxsize=self.queue_maxsize)
+        self._writer_task = asyncio.create_task(self._writer())
+
+    async def stop(self) -> None:
+        if self._writer_task is None:
+            return
+        await self._queue.put(None)  # sentinel: flush sisa antrean lalu berhenti
+        await self._writer_task
+        self._writer_task = None
+        self._queue = None
+        self._fh.close()
+        self._fh = None
 
     def save_percentages(self, record: Dict[str, Any]) -> None:
+        if self._queue is None:
+            # Writer belum berjalan (mis. dipakai di luar aplikasi): tulis langsung
+            self.save_batch([record])
+            return
         try:
-            with open(self.path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            logger.warning("Storage queue full, screening record dropped")
+
+    def save_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Append banyak record sekaligus dengan satu kali write()."""
+        # orjson langsung menghasilkan bytes UTF-8 ringkas (setara ensure_ascii=False).
+        # Encode per record: satu record yang gagal di-encode tidak ikut membuang record lain.
+        lines = []
+        for record in records:
+            try:
+                lines.append(orjson.dumps(record) + b"\n")
+            except orjson.JSONEncodeError:
+                logger.error("Skipping screening record that cannot be encoded", exc_info=True)
+        if not lines:
+            return
+        data = b"".join(lines)
+        try:
+            if self._fh is not None:
+                self._fh.write(data)
+                self._fh.flush()
+            else:
+                with open(self.path, "ab") as f:
+                    f.write(data)
         except Exception as e:
             logger.error("Failed to persist screening percentages to file", exc_info=True)
             raise
 
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            record = await queue.get()
+            if record is None:
+                break
+            batch = [record]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    record = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        record = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            try:
+                await asyncio.to_thread(self.save_batch, batch)
+            except Exception:
+                logger.error("Dropped %d screening records after storage failure", len(batch))
+
 class DBStorageRepository(StorageRepository):
     """
     Skeleton for a DB-backed storage repository. Implement using your preferred DB/ORM.
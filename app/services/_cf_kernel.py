@@ -0,0 +1,32 @@
+from typing import Sequence
+
+
+def combine_cf(vals: Sequence[float]) -> float:
+    """Kombinasi CF yang semuanya >= 0: CF = CF_lama + CF_baru * (1 - CF_lama)."""
+    total = 0.0
+    for v in vals:
+        total = total + v * (1.0 - total)
+    return total
+
+
+def combine_two_cf(cf_current: float, cf_new: float) -> float:
+    """Kombinasi dua CF bertanda (positif, negatif, atau campuran)."""
+    if cf_current >= 0 and cf_new >= 0:
+        return cf_current + cf_new * (1.0 - cf_current)
+    if cf_current <= 0 and cf_new <= 0:
+        return cf_current + cf_new * (1.0 + cf_current)
+
+    denom = 1.0 - min(abs(cf_current), abs(cf_new))
+    if denom == 0.0:
+        return 0.0
+    return (cf_current + cf_new) / denom
+
+
+def combine_cf_signed(vals: Sequence[float]) -> float:
+    """Kombinasi berurutan untuk CF bertanda; 0.0 jika tidak ada nilai."""
+    if not vals:
+        return 0.0
+    total = vals[0]
+    for v in vals[1:]:
+        total = combine_two_cf(total, v)
+    return total
@@ -1,49 +1,148 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
+from bisect import bisect_right
+from collections import deque
+import itertools
 import logging
-from decimal import Decimal, getcontext
+from functools import lru_cache
 import time
 
+from app.models.schemas import get_knowledge_provider
+from app.services import _cf_kernel
+
 logger = logging.getLogger(__name__)
-getcontext().prec = 10  # presisi cukup untuk CF
+
+
+# Batas bawah (persentase >= batas) untuk Ringan, Sedang, Berat, Sangat Berat;
+# indeks bisect_right(_THRESHOLDS, persentase) memilih entri pada _CATEGORY_TABLE.
+_THRESHOLDS = (40, 80, 88, 96)
+# Tiap kategori: (kategori, gejala, rekomendasi) — selalu 3 nilai, dibangun sekali saat import.
+_CATEGORY_TABLE: Dict[str, Tuple[Tuple[str, str, str], ...]] = {
+    "Depresi": (
+        ("Normal",
+         "Tidak menunjukkan gangguan signifikan",
+         "Pertahankan gaya hidup sehat; monitoring jika ada stresor baru."),
+        ("Ringan",
+         "Mood menurun sesekali",
+         "Olahraga ringan; jadwal tidur teratur; journaling."),
+        ("Sedang",
+         "Sedih terus-menerus, motivasi turun",
+         "Konseling psikolog; aktivitas terstruktur; sleep hygiene."),
+        ("Berat",
+         "Sedih mendalam, menarik diri",
+         "Konsultasi psikiater/psikolog; rencana keselamatan; dukungan sosial intensif."),
+        ("Sangat Berat",
+         "Pikiran bunuh diri, putus asa",
+         "Segera hubungi psikiater/layanan darurat; pendampingan keluarga."),
+    ),
+    "Kecemasan": (
+        ("Normal",
+         "Tidak menunjukkan gangguan signifikan",
+         "Lanjutkan pola hidup sehat; kontrol jika keluhan muncul."),
+        ("Ringan",
+         "Gugup, waspada berlebihan",
+         "Relaksasi, aktivitas fisik ringan, sleep hygiene."),
+        ("Sedang",
+         "Gemetar, tegang, waspada",
+         "Relaksasi terjadwal; CBT; batasi kafein/gadget malam."),
+        ("Berat",
+         "Gelisah kuat, sulit bernapas",
+         "Terapi kognitif-perilaku; latihan pernapasan; konsultasi dokter."),
+        ("Sangat Berat",
+         "Serangan panik / takut intens",
+         "Psikiater/psikolog segera; teknik grounding; evaluasi obat."),
+    ),
+    "Stres": (
+        ("Normal",
+         "Tidak menunjukkan gangguan signifikan",
+         "Jaga keseimbangan kerja-istirahat; tidur cukup."),
+        ("Ringan",
+         "Mudah lelah, tegang ringan",
+         "Mindfulness; olahraga ringan; batasi lembur/gadget malam."),
+        ("Sedang",
+         "Cemas soal tugas, ketegangan otot",
+         "Prioritaskan tugas; peregangan; micro-break terjadwal."),
+        ("Berat",
+         "Tekanan tinggi, sulit rileks",
+         "Konseling; manajemen waktu; latihan relaksasi intensif."),
+        ("Sangat Berat",
+         "Burnout/gangguan fungsi",
+         "Pertimbangkan cuti; dukungan profesional; atur beban kerja."),
+    ),
+}
+_UNKNOWN_CATEGORY = ("Tidak Diketahui",
+                     "Konsultasi dengan profesional kesehatan",
+                     "Hubungi tenaga kesehatan untuk evaluasi lebih lanjut")
+
+
+def _response_entry(kategori: str, gejala: str, rekomendasi: str) -> Dict[str, str]:
+    return {"Kategori": kategori, "Gejala": gejala, "Rekomendasi": rekomendasi}
 
 
 class ScreeningService:
+    # float cukup untuk CF: hasil akhir dibulatkan 2 desimal
     SEVERITY_MAPPING = {
-        "TS": Decimal('0.2'),
-        "AS": Decimal('0.4'),
-        "S": Decimal('0.6'),
-        "SS": Decimal('0.8')
+        "TS": 0.2,
+        "AS": 0.4,
+        "S": 0.6,
+        "SS": 0.8
     }
+    _VALID_SEVERITY = frozenset(SEVERITY_MAPPING)
+
+    DISEASES = ("Depresi", "Kecemasan", "Stres")
+    PROCESSING_TIMES_WINDOW = 1024  # jumlah waktu proses terakhir yang disimpan
 
     def __init__(self, knowledge_provider):
         self._kr = knowledge_provider
-        self._processing_times = []
-        self._request_count = 0
+        self._valid_symptoms = frozenset(self._kr.list_all_symptoms())
+        self.max_symptoms = len(self._valid_symptoms)
+        self._max_symptoms_err = f"Jumlah gejala melebihi batas maksimal {self.max_symptoms}"
+        # Knowledge provider statis: kode gejala -> ((penyakit, CF pakar), ...) dibangun sekali,
+        # sehingga jawaban cukup diiterasi satu kali tanpa struktur perantara.
+        symptom_targets: Dict[str, List[Tuple[str, float]]] = {}
+        for penyakit in self.DISEASES:
+            for gejala in self._kr.get_symptoms_for_disease(penyakit):
+                symptom_targets.setdefault(gejala, []).append((penyakit, self._kr.get_cf_pakar(gejala)))
+        self._symptom_targets = {kode: tuple(t) for kode, t in symptom_targets.items()}
+        # Nilai CF statis: cek rentang [-1,1] sekali di sini, bukan per gejala per request
+        for nilai, cf_user in self.SEVERITY_MAPPING.items():
+            if not (-1.0 <= cf_user <= 1.0):
+                logger.warning("CF user %s di luar [-1,1]: %s", nilai, cf_user)
+        for kode, targets in self._symptom_targets.items():
+            for _, cf_pakar in targets:
+                if not (-1.0 <= cf_pakar <= 1.0):
+                    logger.warning("CF pakar %s di luar [-1,1]: %s", kode, cf_pakar)
+        # Severity selalu positif; jika semua CF pakar juga >= 0 pakai kernel kombinasi tanpa cabang tanda
+        self._combine = (
+            _cf_kernel.combine_cf
+            if all(cf >= 0 for targets in self._symptom_targets.values() for _, cf in targets)
+            else _cf_kernel.combine_cf_signed
+        )
+        self._processing_times = deque(maxlen=self.PROCESSING_TIMES_WINDOW)  # append deque thread-safe
+        self._request_counter = itertools.count(1)  # next() atomik di bawah GIL
 
     def process_screening(self, jawaban: Dict[str, str]) -> Tuple[Dict[str, Dict[str, str]], Dict[str, float]]:
-        start_time = time.time()
-        self._request_count += 1
+        start_ns = time.perf_counter_ns()
+        count = next(self._request_counter)  # lokal: tiap pemanggil mencatat nomornya sendiri
         try:
             self._validate_input(jawaban)
-            cf_user_input = self._map_severity_values(jawaban)
-            hasil_cf = self._calculate_cf_total(cf_user_input)  # persentase float
+            hasil_cf = self._calculate_cf_total(jawaban)        # persentase float
             results = self._format_results(hasil_cf)            # untuk klien
-            processing_time = time.time() - start_time
+            processing_time = (time.perf_counter_ns() - start_ns) * 1e-9
             self._processing_times.append(processing_time)
             logger.info(
-                f"Screening processed - Symptoms: {len(jawaban)}, "
-                f"Time: {processing_time:.3f}s, Total: {self._request_count}"
+                "Screening processed - Symptoms: %d, Time: %.3fs, Total: %d",
+                len(jawaban), processing_time, count
             )
             return results, hasil_cf
         except ValueError as e:
-            logger.warning(f"Input validation failed: {str(e)}")
+            logger.warning("Input validation failed: %s", e)
             raise e
         except Exception as e:
             logger.error(
-                f"Screening processing error: {str(e)}",
+                "Screening processing error: %s", e,
                 exc_info=True,
                 extra={"symptoms_count": len(jawaban) if isinstance(jawaban, dict) else 0,
-                       "processing_time": time.time() - start_time}
+                       "processing_time": (time.perf_counter_ns() - start_ns) * 1e-9}
             )
             raise Exception(f"Terjadi kesalahan sistem dalam memproses screening: {str(e)}")
 
@@ -51,15 +150,19 @@ class ScreeningService:
         if not jawaban:
             raise ValueError("Data jawaban tidak boleh kosong")
 
-        valid_symptoms = set(self._kr.list_all_symptoms())
-        if len(jawaban) > len(valid_symptoms):
-            raise ValueError(f"Jumlah gejala melebihi batas maksimal {len(valid_symptoms)}")
+        valid_symptoms = self._valid_symptoms
+        if len(jawaban) > self.max_symptoms:
+            raise ValueError(self._max_symptoms_err)
+
+        # Fast path (kasus umum): pengecekan set di C tanpa alokasi; pesan error hanya dibangun jika gagal
+        if valid_symptoms.issuperset(jawaban) and self._VALID_SEVERITY.issuperset(jawaban.values()):
+            return
 
         invalid_codes, invalid_values = [], []
         for kode, nilai in jawaban.items():
             if kode not in valid_symptoms:
                 invalid_codes.append(kode)
-            if nilai not in set(self.SEVERITY_MAPPING.keys()):
+            if nilai not in self._VALID_SEVERITY:
                 invalid_values.append(f"{kode}: {nilai}")
 
         errors = []
@@ -70,141 +173,38 @@ class ScreeningService:
         if errors:
             raise ValueError("; ".join(errors))
 
-    def _map_severity_values(self, jawaban: Dict[str, str]) -> Dict[str, Decimal]:
-        return {kode: self.SEVERITY_MAPPING[nilai] for kode, nilai in jawaban.items()}
-
-    def combine_two_cf(self, cf_current: Decimal, cf_new: Decimal) -> Decimal:
-        cf_current = Decimal(cf_current)
-        cf_new = Decimal(cf_new)
-
-        if cf_current >= 0 and cf_new >= 0:
-            return cf_current + cf_new * (Decimal('1.0') - cf_current)
-        if cf_current <= 0 and cf_new <= 0:
-            return cf_current + cf_new * (Decimal('1.0') + cf_current)
-
-        abs_current = abs(cf_current)
-        abs_new = abs(cf_new)
-        denom = Decimal('1.0') - min(abs_current, abs_new)
-        if denom == Decimal('0'):
-            return Decimal('0.0')
-        return (cf_current + cf_new) / denom
-
-    def _calculate_cf_total(self, cf_user_input: Dict[str, Decimal]) -> Dict[str, float]:
-        hasil = {}
-        for penyakit in ["Depresi", "Kecemasan", "Stres"]:
-            gejala_list = self._kr.get_symptoms_for_disease(penyakit)
-            cf_combined = []
-            for gejala in gejala_list:
-                if gejala in cf_user_input:
-                    cf_user = cf_user_input[gejala]
-                    cf_pakar = self._kr.get_cf_pakar(gejala)
-                    if not (Decimal('-1') <= cf_pakar <= Decimal('1')):
-                        logger.warning(f"CF pakar {gejala} di luar [-1,1]: {cf_pakar}")
-                    if not (Decimal('-1') <= cf_user <= Decimal('1')):
-                        logger.warning(f"CF user {gejala} di luar [-1,1]: {cf_user}")
-                    cf_gejala = cf_user * cf_pakar
-                    cf_combined.append(cf_gejala)
-
-            if not cf_combined:
-                hasil[penyakit] = 0.0
-            else:
-                cf_total = cf_combined[0]
-                for cf_val in cf_combined[1:]:
-                    cf_total = self.combine_two_cf(cf_total, cf_val)
-                percentage = cf_total * Decimal('100')
-                try:
-                    pct_float = float(percentage)
-                except Exception:
-                    pct_float = 0.0
-                hasil[penyakit] = round(pct_float, 2)
-        return hasil
+    # Alias langsung ke kernel float, tanpa frame pembungkus
+    combine_two_cf = staticmethod(_cf_kernel.combine_two_cf)
+
+    def _calculate_cf_total(self, jawaban: Dict[str, str]) -> Dict[str, float]:
+        """Satu kali iterasi: map severity, kalikan CF pakar, kelompokkan per penyakit, lalu kombinasi."""
+        buckets: Dict[str, List[float]] = {penyakit: [] for penyakit in self.DISEASES}
+        severity = self.SEVERITY_MAPPING
+        targets = self._symptom_targets
+        for kode, nilai in jawaban.items():
+            cf_user = severity[nilai]
+            for penyakit, cf_pakar in targets.get(kode, ()):
+                buckets[penyakit].append(cf_user * cf_pakar)
+
+        combine = self._combine
+        return {
+            penyakit: round(combine(cf_list) * 100.0, 2) if cf_list else 0.0
+            for penyakit, cf_list in buckets.items()
+        }
 
     def _format_results(self, hasil_cf: Dict[str, float]) -> Dict[str, Dict[str, str]]:
         output = {}
         for penyakit, persentase in hasil_cf.items():
-            kategori, gejala_desc, rekomendasi = self._determine_category(penyakit, persentase)
-            output[penyakit] = {
-                "Kategori": kategori,
-                "Gejala": gejala_desc,
-                "Rekomendasi": rekomendasi,
-            }
+            kategori = _CATEGORY_TABLE.get(penyakit)
+            if kategori is None:
+                output[penyakit] = _response_entry(*_UNKNOWN_CATEGORY)  # fallback defensif
+            else:
+                # dict baru per request: hasil milik pemanggil dan boleh diubah
+                output[penyakit] = _response_entry(*kategori[bisect_right(_THRESHOLDS, persentase)])
         return output
 
-    def _determine_category(self, penyakit: str, persentase: float) -> Tuple[str, str, str]:
-        if penyakit == "Depresi":
-            return self._kategori_depresi(persentase)
-        elif penyakit == "Kecemasan":
-            return self._kategori_kecemasan(persentase)
-        elif penyakit == "Stres":
-            return self._kategori_stres(persentase)
-        # fallback defensif
-        return ("Tidak Diketahui",
-                "Konsultasi dengan profesional kesehatan",
-                "Hubungi tenaga kesehatan untuk evaluasi lebih lanjut")
-
-    # --- kategori helpers (selalu return 3 nilai) ---
-    def _kategori_depresi(self, persentase: float) -> Tuple[str, str, str]:
-        if persentase >= 96:
-            return ("Sangat Berat",
-                    "Pikiran bunuh diri, putus asa",
-                    "Segera hubungi psikiater/layanan darurat; pendampingan keluarga.")
-        elif persentase >= 88:
-            return ("Berat",
-                    "Sedih mendalam, menarik diri",
-                    "Konsultasi psikiater/psikolog; rencana keselamatan; dukungan sosial intensif.")
-        elif persentase >= 80:
-            return ("Sedang",
-                    "Sedih terus-menerus, motivasi turun",
-                    "Konseling psikolog; aktivitas terstruktur; sleep hygiene.")
-        elif persentase >= 40:
-            return ("Ringan",
-                    "Mood menurun sesekali",
-                    "Olahraga ringan; jadwal tidur teratur; journaling.")
-        else:
-            return ("Normal",
-                    "Tidak menunjukkan gangguan signifikan",
-                    "Pertahankan gaya hidup sehat; monitoring jika ada stresor baru.")
-
-    def _kategori_kecemasan(self, persentase: float) -> Tuple[str, str, str]:
-        if persentase >= 96:
-            return ("Sangat Berat",
-                    "Serangan panik / takut intens",
-                    "Psikiater/psikolog segera; teknik grounding; evaluasi obat.")
-        elif persentase >= 88:
-            return ("Berat",
-                    "Gelisah kuat, sulit bernapas",
-                    "Terapi kognitif-perilaku; latihan pernapasan; konsultasi dokter.")
-        elif persentase >= 80:
-            return ("Sedang",
-                    "Gemetar, tegang, waspada",
-                    "Relaksasi terjadwal; CBT; batasi kafein/gadget malam.")
-        elif persentase >= 40:
-            return ("Ringan",
-                    "Gugup, waspada berlebihan",
-                    "Relaksasi, aktivitas fisik ringan, sleep hygiene.")
-        else:
-            return ("Normal",
-                    "Tidak menunjukkan gangguan signifikan",
-                    "Lanjutkan pola hidup sehat; kontrol jika keluhan muncul.")
-
-    def _kategori_stres(self, persentase: float) -> Tuple[str, str, str]:
-        if persentase >= 96:
-            return ("Sangat Berat",
-                    "Burnout/gangguan fungsi",
-                    "Pertimbangkan cuti; dukungan profesional; atur beban kerja.")
-        elif persentase >= 88:
-            return ("Berat",
-                    "Tekanan tinggi, sulit rileks",
-                    "Konseling; manajemen waktu; latihan relaksasi intensif.")
-        elif persentase >= 80:
-            return ("Sedang",
-                    "Cemas soal tugas, ketegangan otot",
-                    "Prioritaskan tugas; peregangan; micro-break terjadwal.")
-        elif persentase >= 40:
-            return ("Ringan",
-                    "Mudah lelah, tegang ringan",
-                    "Mindfulness; olahraga ringan; batasi lembur/gadget malam.")
-        else:
-            return ("Normal",
-                    "Tidak menunjukkan gangguan signifikan",
-                    "Jaga keseimbangan kerja-istirahat; tidur cukup.")
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def get_screening_service() -> ScreeningService:
+    """Singleton service per proses/worker, dibuat saat pertama kali dibutuhkan."""
+    return ScreeningService(get_knowledge_provider())
\ No newline at end of file
@@ -0,0 +1,93 @@
+import itertools
+import random
+
+import pytest
+
+from app.models.schemas import InMemoryKnowledgeProvider
+from app.services.screening_service import ScreeningService
+
+DEPRESI = ("G04", "G05", "G10", "G13", "G16", "G17", "G21")
+KECEMASAN = ("G02", "G03", "G07", "G09", "G15", "G19", "G20")
+STRES = ("G01", "G06", "G08", "G11", "G12", "G14", "G18")
+
+
+@pytest.fixture(scope="module")
+def service():
+    return ScreeningService(InMemoryKnowledgeProvider())
+
+
+def all_answers(nilai):
+    return {f"G{i:02}": nilai for i in range(1, 22)}
+
+
+def categories(results):
+    return {penyakit: r["Kategori"] for penyakit, r in results.items()}
+
+
+@pytest.mark.parametrize("nilai, persentase, kategori", [
+    ("TS", 75.07, "Ringan"),
+    ("AS", 95.6, "Berat"),
+    ("S", 99.56, "Sangat Berat"),
+    ("SS", 99.99, "Sangat Berat"),
+])
+def test_uniform_answers(service, nilai, persentase, kategori):
+    results, hasil_cf = service.process_screening(all_answers(nilai))
+
+    assert hasil_cf == {"Depresi": persentase, "Kecemasan": persentase, "Stres": persentase}
+    assert categories(results) == {"Depresi": kategori, "Kecemasan": kategori, "Stres": kategori}
+
+
+def test_mixed_answers(service):
+    jawaban = all_answers("TS")
+    jawaban.update({"G02": "AS", "G01": "SS", "G04": "SS", "G05": "S", "G10": "AS"})
+    results, hasil_cf = service.process_screening(jawaban)
+
+    assert hasil_cf == {"Depresi": 96.27, "Kecemasan": 80.54, "Stres": 91.49}
+    assert categories(results) == {"Depresi": "Sangat Berat", "Kecemasan": "Sedang", "Stres": "Berat"}
+    assert results["Kecemasan"] == {
+        "Kategori": "Sedang",
+        "Gejala": "Gemetar, tegang, waspada",
+        "Rekomendasi": "Relaksasi terjadwal; CBT; batasi kafein/gadget malam.",
+    }
+
+
+def test_disease_without_answers_is_normal(service):
+    results, hasil_cf = service.process_screening({"G04": "TS"})
+
+    assert hasil_cf == {"Depresi": 18.0, "Kecemasan": 0.0, "Stres": 0.0}
+    assert categories(results) == {"Depresi": "Normal", "Kecemasan": "Normal", "Stres": "Normal"}
+
+
+@pytest.mark.parametrize("persentase, kategori", [
+    (0.0, "Normal"),
+    (39.99, "Normal"),
+    (40.0, "Ringan"),
+    (79.99, "Ringan"),
+    (80.0, "Sedang"),
+    (87.99, "Sedang"),
+    (88.0, "Berat"),
+    (95.99, "Berat"),
+    (96.0, "Sangat Berat"),
+    (100.0, "Sangat Berat"),
+])
+def test_category_boundaries(service, persentase, kategori):
+    hasil_cf = {"Depresi": persentase, "Kecemasan": persentase, "Stres": persentase}
+
+    assert categories(service._format_results(hasil_cf)) == {
+        "Depresi": kategori, "Kecemasan": kategori, "Stres": kategori,
+    }
+
+
+def test_result_independent_of_key_order(service):
+    jawaban = dict(zip(
+        DEPRESI + KECEMASAN + STRES,
+        itertools.cycle(("SS", "TS", "S", "AS", "AS", "S")),
+    ))
+    expected = service.process_screening(jawaban)
+
+    items = list(jawaban.items())
+    rng = random.Random(0)
+    for _ in range(50):
+        rng.shuffle(items)
+        assert service.process_screening(dict(items)) == expected
+    assert service.process_screening(dict(reversed(list(jawaban.items())))) == expected
@@ -0,0 +1,43 @@
+import orjson
+import pytest
+
+from app.repositories.storage import FileStorageRepository
+
+
+def read_records(path):
+    with open(path, "rb") as f:
+        return [orjson.loads(line) for line in f]
+
+
+@pytest.mark.asyncio
+async def test_records_queued_before_stop_are_written(tmp_path):
+    path = tmp_path / "results.jsonl"
+    repo = FileStorageRepository(path=str(path), batch_size=2, flush_interval=10.0)
+    await repo.start()
+    records = [{"timestamp": f"t{i}", "percentages": {"Depresi": float(i)}} for i in range(5)]
+    for record in records:
+        repo.save_percentages(record)
+    await repo.stop()
+
+    assert read_records(path) == records
+
+
+@pytest.mark.asyncio
+async def test_unencodable_record_does_not_drop_rest_of_batch(tmp_path):
+    path = tmp_path / "results.jsonl"
+    repo = FileStorageRepository(path=str(path))
+    await repo.start()
+    repo.save_percentages({"x": object()})
+    repo.save_percentages({"ok": 1})
+    await repo.stop()
+
+    assert read_records(path) == [{"ok": 1}]
+
+
+def test_save_without_start_writes_directly(tmp_path):
+    path = tmp_path / "data" / "results.jsonl"
+    repo = FileStorageRepository(path=str(path))
+    repo.save_percentages({"ok": 1})
+    repo.save_percentages({"ok": 2})
+
+    assert read_records(path) == [{"ok": 1}, {"ok": 2}]